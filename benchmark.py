@@ -0,0 +1,319 @@
+"""
+Benchmark — เปรียบเทียบ prompt/โมเดลบนชุดโจทย์มาตรฐาน (golden set)
+(วัดความเร็ว, จำนวน token, อัตรา parse JSON สำเร็จ และความถูกต้องของคำตอบ)
+
+Usage:
+    python benchmark.py run [--variant flash] [--mode live|record|replay]
+    python benchmark.py compare benchmarks/reports/a.json benchmarks/reports/b.json
+
+Modes:
+    live    call the Gemini API (needs GEMINI_API_KEY)
+    record  like live, and save each streamed response under benchmarks/fixtures/
+    replay  re-score saved fixtures offline (for CI); fails if a fixture is
+            missing or was recorded for a different prompt/model
+"""
+
+import argparse
+import datetime
+import hashlib
+import json
+import os
+import re
+import statistics
+import sys
+import time
+from typing import Optional
+
+import google.generativeai as genai
+from dotenv import load_dotenv
+from PIL import Image
+
+import output_budget
+import solver
+
+BENCH_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmarks")
+GOLDEN_VERSION = "v1"
+GOLDEN_DIR = os.path.join(BENCH_DIR, "golden", GOLDEN_VERSION)
+FIXTURES_DIR = os.path.join(BENCH_DIR, "fixtures", GOLDEN_VERSION)
+REPORTS_DIR = os.path.join(BENCH_DIR, "reports")
+VARIANTS_PATH = os.path.join(BENCH_DIR, "variants.json")
+
+
+# ──────────────────────────────────────────────
+# Golden set / variants
+# ──────────────────────────────────────────────
+def load_cases() -> list:
+    with open(os.path.join(GOLDEN_DIR, "cases.json"), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def load_variants() -> list:
+    """Read variants.json, resolving any per-language prompt override files."""
+    with open(VARIANTS_PATH, encoding="utf-8") as f:
+        variants = json.load(f)
+    for v in variants:
+        instructions = dict(solver.SYSTEM_INSTRUCTIONS)
+        for lang, path in v.get("system_instructions", {}).items():
+            with open(os.path.join(BENCH_DIR, path), encoding="utf-8") as f:
+                instructions[lang] = f.read()
+        v["_instructions"] = instructions
+    return variants
+
+
+def _budget(variant: dict, case: dict) -> dict:
+    return output_budget.plan(
+        case["problem"], bool(case.get("image")), case["lang"], variant["model"]
+    )
+
+
+def _request_hash(variant: dict, case: dict) -> str:
+    """Fingerprint of everything that affects the response, to detect stale fixtures."""
+    h = hashlib.sha256()
+    h.update(variant["model"].encode())
+    h.update(json.dumps(_budget(variant, case), sort_keys=True).encode())
+    h.update(variant["_instructions"][case["lang"]].encode())
+    h.update(case["problem"].encode())
+    if case.get("image"):
+        with open(os.path.join(GOLDEN_DIR, case["image"]), "rb") as f:
+            h.update(f.read())
+    return h.hexdigest()
+
+
+# ──────────────────────────────────────────────
+# Running a case
+# ──────────────────────────────────────────────
+def _call_live(variant: dict, case: dict) -> dict:
+    """Stream one response from Gemini and capture chunk timings and token usage.
+
+    The request uses the same output budget as the app. It is a single call
+    with no continuation, so the report shows how often the budget truncates.
+    """
+    image = None
+    if case.get("image"):
+        image = Image.open(os.path.join(GOLDEN_DIR, case["image"]))
+    model = genai.GenerativeModel(
+        model_name=variant["model"],
+        system_instruction=variant["_instructions"][case["lang"]],
+    )
+
+    budget = _budget(variant, case)
+    parts = solver.build_parts(case["problem"], image, case["lang"]) + [budget["hint"]]
+
+    start = time.perf_counter()
+    response = model.generate_content(
+        parts, generation_config=output_budget.generation_config(budget), stream=True
+    )
+    chunks = []
+    for chunk in response:
+        try:
+            text = chunk.text
+        except ValueError:  # chunk without text parts (e.g. finish reason only)
+            text = ""
+        chunks.append({"t": round(time.perf_counter() - start, 4), "text": text})
+    latency = time.perf_counter() - start
+
+    used, thinking = output_budget.output_tokens(response)
+    return {
+        "request_hash": _request_hash(variant, case),
+        "model": variant["model"],
+        "chunks": chunks,
+        "latency_s": round(latency, 4),
+        "input_tokens": response.usage_metadata.prompt_token_count,
+        "output_tokens": used,  # includes thinking, like budget_tokens
+        "thinking_tokens": thinking,
+        "budget_tokens": budget["max_output_tokens"],
+        "truncated": output_budget.is_truncated(response),
+    }
+
+
+def _fixture_path(variant: dict, case: dict) -> str:
+    return os.path.join(FIXTURES_DIR, variant["name"], f"{case['id']}.json")
+
+
+# The final answer is the red <span> the system instructions ask for
+ANSWER_SPAN = re.compile(
+    r"<span[^>]*color\s*:\s*#E74C3C[^>]*>(.*?)</span>", re.IGNORECASE | re.DOTALL
+)
+# A minus is only a sign when it doesn't follow an operand, so "(x-3)" reads as 3
+NUMBER = re.compile(r"(?:(?<![\w).])[-−])?\d+(?:\.\d+)?")
+
+
+def _numbers(text: str) -> list:
+    text = re.sub(r"<[^>]+>", " ", text)
+    text = re.sub(r"(?<=\d),(?=\d{3})", "", text)  # 1,200 → 1200
+    return [float(n.replace("−", "-")) for n in NUMBER.findall(text)]
+
+
+def final_answer(result: dict) -> str:
+    """Text of the red final-answer span(s) in the last step that has any."""
+    for step in reversed(result["steps"]):
+        spans = ANSWER_SPAN.findall(step.get("explanation", ""))
+        if spans:
+            return " ".join(spans)
+    return ""
+
+
+def is_correct(result: dict, answers: list) -> bool:
+    """True if every expected answer appears as a number in the final answer."""
+    found = _numbers(final_answer(result))
+    return all(any(abs(n - a) < 1e-6 for n in found) for a in answers)
+
+
+def score(case: dict, recording: dict) -> dict:
+    """Turn a live or replayed recording into one report row."""
+    first = next((c["t"] for c in recording["chunks"] if c["text"]), None)
+    row = {
+        "id": case["id"],
+        "lang": case["lang"],
+        "image": bool(case.get("image")),
+        "input_tokens": recording["input_tokens"],
+        "output_tokens": recording["output_tokens"],
+        "budget_tokens": recording["budget_tokens"],
+        "truncated": recording["truncated"],
+        "ttft_s": first,
+        "latency_s": recording["latency_s"],
+        "parsed": False,
+        "valid": False,
+        "correct": False,
+    }
+    try:
+        result = solver.parse_reply("".join(c["text"] for c in recording["chunks"]))
+    except json.JSONDecodeError:
+        return row
+    except ValueError:
+        row["parsed"] = True
+        return row
+    row.update(parsed=True, valid=True, correct=is_correct(result, case["answers"]))
+    return row
+
+
+def fixture_problem(variant: dict, case: dict) -> Optional[str]:
+    """Why a case can't be replayed ("missing"/"stale"), or None if its fixture is usable."""
+    path = _fixture_path(variant, case)
+    if not os.path.exists(path):
+        return "missing"
+    with open(path, encoding="utf-8") as f:
+        if json.load(f).get("request_hash") != _request_hash(variant, case):
+            return "stale"
+    return None
+
+
+def run_case(variant: dict, case: dict, mode: str) -> dict:
+    path = _fixture_path(variant, case)
+    if mode == "replay":
+        problem = fixture_problem(variant, case)
+        if problem:
+            raise ValueError(f"Fixture for {variant['name']}/{case['id']} is {problem}; re-record it")
+        with open(path, encoding="utf-8") as f:
+            recording = json.load(f)
+    else:
+        recording = _call_live(variant, case)
+        if mode == "record":
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(recording, f, ensure_ascii=False, indent=2)
+    return score(case, recording)
+
+
+# ──────────────────────────────────────────────
+# Reports
+# ──────────────────────────────────────────────
+def summarize(rows: list) -> dict:
+    n = len(rows)
+    latencies = sorted(r["latency_s"] for r in rows)
+    ttfts = [r["ttft_s"] for r in rows if r["ttft_s"] is not None]
+    return {
+        "cases": n,
+        "parse_rate": round(sum(r["parsed"] for r in rows) / n, 3),
+        "valid_rate": round(sum(r["valid"] for r in rows) / n, 3),
+        "truncated_rate": round(sum(r["truncated"] for r in rows) / n, 3),
+        "accuracy": round(sum(r["correct"] for r in rows) / n, 3),
+        "latency_p50_s": round(statistics.median(latencies), 3),
+        "latency_p95_s": round(latencies[min(n - 1, int(0.95 * n))], 3),
+        "ttft_mean_s": round(statistics.mean(ttfts), 3) if ttfts else None,
+        "input_tokens": sum(r["input_tokens"] for r in rows),
+        "output_tokens": sum(r["output_tokens"] for r in rows),
+    }
+
+
+def run_variant(variant: dict, mode: str) -> dict:
+    rows = []
+    for case in load_cases():
+        rows.append(run_case(variant, case, mode))
+        print(f"  {case['id']:<28} {rows[-1]['latency_s']:>6.2f}s  valid={rows[-1]['valid']}  correct={rows[-1]['correct']}")
+    return {
+        "golden": GOLDEN_VERSION,
+        "variant": {k: v for k, v in variant.items() if not k.startswith("_")},
+        "mode": mode,
+        "created": datetime.datetime.now().isoformat(timespec="seconds"),
+        "summary": summarize(rows),
+        "cases": rows,
+    }
+
+
+def print_comparison(reports: list):
+    keys = list(reports[0]["summary"])
+    names = [r["variant"]["name"] for r in reports]
+    print(f"{'':<16}" + "".join(f"{n:>14}" for n in names))
+    for key in keys:
+        print(f"{key:<16}" + "".join(f"{str(r['summary'][key]):>14}" for r in reports))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark prompt/model variants on the golden set.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    run_p = sub.add_parser("run", help="run variants and write reports")
+    run_p.add_argument("--variant", action="append", help="variant name (default: all)")
+    run_p.add_argument("--mode", choices=["live", "record", "replay"], default="replay")
+    cmp_p = sub.add_parser("compare", help="print the summaries of saved reports side by side")
+    cmp_p.add_argument("reports", nargs="+")
+    args = parser.parse_args()
+
+    if args.command == "compare":
+        reports = []
+        for path in args.reports:
+            with open(path, encoding="utf-8") as f:
+                reports.append(json.load(f))
+        print_comparison(reports)
+        return
+
+    variants = load_variants()
+    if args.variant:
+        variants = [v for v in variants if v["name"] in args.variant]
+        if not variants:
+            sys.exit(f"Unknown variant(s): {', '.join(args.variant)}")
+    if args.mode == "replay":
+        # Check every fixture up front so a bad run leaves nothing behind
+        cases = load_cases()
+        problems = [
+            f"{v['name']}/{c['id']}: {p}"
+            for v in variants for c in cases
+            if (p := fixture_problem(v, c))
+        ]
+        if problems:
+            shown = "\n  ".join(problems[:5]) + ("\n  ..." if len(problems) > 5 else "")
+            sys.exit(
+                f"Cannot replay: {len(problems)} of {len(variants) * len(cases)} fixtures "
+                f"are missing or stale.\n  {shown}\n"
+                f"Record them first: python benchmark.py run --mode record"
+            )
+    else:
+        load_dotenv()
+        genai.configure(api_key=os.environ.get("GEMINI_API_KEY", ""))
+
+    os.makedirs(REPORTS_DIR, exist_ok=True)
+    reports = []
+    for variant in variants:
+        print(f"▶ {variant['name']} ({variant['model']}, {args.mode})")
+        report = run_variant(variant, args.mode)
+        stamp = report["created"].replace(":", "")
+        path = os.path.join(REPORTS_DIR, f"{stamp}-{GOLDEN_VERSION}-{variant['name']}.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"  → {os.path.relpath(path)}")
+        reports.append(report)
+    print_comparison(reports)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""
+Build assets — ตัดฟอนต์ Sarabun/Inter ให้เหลือเฉพาะอักษรไทย+ละติน แล้วแปลงเป็น woff2
+(ใช้งานแบบออฟไลน์ได้ ไม่ต้องโหลดฟอนต์จาก fonts.googleapis.com)
+
+Usage:
+    pip install -r requirements-dev.txt
+    python build_assets.py [--src fonts-src]
+    git add static/fonts static/fonts.css
+
+`--src` must contain the static TTFs from the Google Fonts downloads of
+Sarabun and Inter (file names as in FONT_FILES below). Output goes to
+static/fonts/*.woff2 (content-hashed names) and static/fonts.css, which
+the app serves through Streamlit's static file serving.
+
+Commit the output (both fonts are under the SIL Open Font License).
+Deploys such as Streamlit Cloud only install requirements.txt and never
+run this script, so fonts that aren't committed never reach them; the
+app then falls back to system fonts. Re-run and re-commit whenever the
+UI labels in i18n.py gain new characters.
+"""
+
+import argparse
+import hashlib
+import io
+import os
+import sys
+
+from i18n import LANG
+from markup import STATIC_DIR
+
+try:
+    from fontTools import subset
+    from fontTools.ttLib import TTFont
+except ImportError:  # build-time only dependency
+    subset = None
+
+FONT_FILES = {
+    ("Sarabun", 300): "Sarabun-Light.ttf",
+    ("Sarabun", 400): "Sarabun-Regular.ttf",
+    ("Sarabun", 600): "Sarabun-SemiBold.ttf",
+    ("Sarabun", 700): "Sarabun-Bold.ttf",
+    ("Inter", 300): "Inter-Light.ttf",
+    ("Inter", 400): "Inter-Regular.ttf",
+    ("Inter", 600): "Inter-SemiBold.ttf",
+    ("Inter", 700): "Inter-Bold.ttf",
+}
+
+# Basic Latin, Latin-1, Thai, general punctuation, arrows and the maths
+# operators the AI uses in explanations (+−×÷ ≤ ≥ …)
+UNICODES = [
+    *range(0x0020, 0x007F),
+    *range(0x00A0, 0x0100),
+    *range(0x0E00, 0x0E80),
+    *range(0x2010, 0x2028),
+    *range(0x2190, 0x2270),
+]
+
+FONTS_DIR = os.path.join(STATIC_DIR, "fonts")
+FONTS_CSS = os.path.join(STATIC_DIR, "fonts.css")
+
+
+def _ui_text() -> str:
+    """Every character in the UI labels, so nothing the app prints is left out."""
+    return "".join(v for labels in LANG.values() for v in labels.values())
+
+
+def _unicode_range(codepoints) -> str:
+    """Compact a set of code points into a CSS `unicode-range` value."""
+    ranges, start, prev = [], None, None
+    for cp in sorted(codepoints):
+        if start is None:
+            start = prev = cp
+        elif cp == prev + 1:
+            prev = cp
+        else:
+            ranges.append((start, prev))
+            start = prev = cp
+    if start is not None:
+        ranges.append((start, prev))
+    return ", ".join(
+        f"U+{a:04X}" if a == b else f"U+{a:04X}-{b:04X}" for a, b in ranges
+    )
+
+
+def subset_font(path: str) -> tuple:
+    """Return (woff2 bytes, covered code points) for one source font."""
+    options = subset.Options()
+    options.flavor = "woff2"
+    options.layout_features = ["*"]  # Thai needs its mark-positioning features
+    options.name_IDs = ["*"]
+    options.notdef_outline = True
+
+    font = TTFont(path)
+    subsetter = subset.Subsetter(options)
+    subsetter.populate(unicodes=UNICODES, text=_ui_text())
+    subsetter.subset(font)
+
+    buf = io.BytesIO()
+    font.flavor = "woff2"
+    font.save(buf)
+    return buf.getvalue(), set(font.getBestCmap())
+
+
+def build(src_dir: str) -> list:
+    """Subset every font in FONT_FILES, write woff2 + fonts.css; return written paths."""
+    os.makedirs(FONTS_DIR, exist_ok=True)
+    for old in os.listdir(FONTS_DIR):
+        if old.endswith(".woff2"):
+            os.remove(os.path.join(FONTS_DIR, old))
+
+    rules, written = [], []
+    for (family, weight), filename in FONT_FILES.items():
+        data, codepoints = subset_font(os.path.join(src_dir, filename))
+        digest = hashlib.sha256(data).hexdigest()[:10]
+        out_name = f"{family.lower()}-{weight}.{digest}.woff2"
+        with open(os.path.join(FONTS_DIR, out_name), "wb") as f:
+            f.write(data)
+        written.append(os.path.join(FONTS_DIR, out_name))
+        rules.append(
+            "@font-face {\n"
+            f"    font-family: '{family}';\n"
+            "    font-style: normal;\n"
+            f"    font-weight: {weight};\n"
+            "    font-display: swap;\n"
+            f'    src: url("fonts/{out_name}") format("woff2");\n'
+            f"    unicode-range: {_unicode_range(codepoints)};\n"
+            "}\n"
+        )
+
+    with open(FONTS_CSS, "w", encoding="utf-8") as f:
+        f.write("/* Generated by build_assets.py — do not edit */\n" + "".join(rules))
+    written.append(FONTS_CSS)
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Subset and self-host the UI fonts.")
+    parser.add_argument("--src", default="fonts-src", help="directory with the source TTFs")
+    args = parser.parse_args()
+
+    if subset is None:
+        sys.exit("build_assets.py needs fontTools: pip install -r requirements-dev.txt")
+    for path in build(args.src):
+        print(f"{os.path.getsize(path):>8}  {os.path.relpath(path)}")
+
+
+if __name__ == "__main__":
+    main()
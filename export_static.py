@@ -0,0 +1,197 @@
+"""
+Static export — สร้างไฟล์ HTML บทเรียนแบบออฟไลน์จากผลเฉลยที่ได้แล้ว
+(เปิดดูทีละขั้นตอนในเบราว์เซอร์ได้เลย ไม่ต้องมี Streamlit server)
+
+Usage:
+    python export_static.py solved.json out_dir/
+
+`solved.json` is a list of objects:
+    {"problem": "โจทย์...", "lang": "TH", "result": {...ai_result...}}
+Download it from the app sidebar ("Download solved problems"), which
+collects every problem solved in the current session.
+"""
+
+import argparse
+import html
+import json
+import os
+import shutil
+from typing import Optional
+
+import markup
+from i18n import LANG
+
+# Stand-ins for the Streamlit widgets the app CSS expects
+BUNDLE_CSS = """
+body {
+    margin: 0;
+    background: #FAFAFA;
+    color: #333333;
+    font-family: 'Inter', 'Sarabun', sans-serif;
+}
+[hidden] { display: none !important; }
+.problem-text { font-size: 1.05rem; color: #888; padding: 0.4rem 0; }
+.progress-bar {
+    height: 8px;
+    background: #F0F2F6;
+    border-radius: 4px;
+    margin-bottom: 1rem;
+    overflow: hidden;
+}
+.progress-bar > div { height: 100%; width: 0; background: #2E86C1; transition: width 0.3s ease; }
+.next-btn > button, .index-link {
+    display: block;
+    width: 100%;
+    box-sizing: border-box;
+    padding: 0.85rem 1.5rem;
+    font-weight: 600;
+    border-radius: 14px;
+    border: none;
+    min-height: 62px;
+    font-family: 'Inter', 'Sarabun', sans-serif;
+    cursor: pointer;
+}
+.index-link {
+    min-height: 0;
+    margin-bottom: 0.8rem;
+    background: #ffffff;
+    border: 1px solid #e8e8e8;
+    color: #333;
+    text-decoration: none;
+}
+"""
+
+REVEAL_JS = """
+(function () {
+    var steps = document.querySelectorAll(".bundle-step");
+    var next = document.getElementById("next");
+    var labels = JSON.parse(document.getElementById("labels").textContent);
+    var shown = 0;
+    function update() {
+        document.getElementById("progress").textContent =
+            labels.step + " " + shown + " / " + steps.length;
+        document.getElementById("bar").style.width =
+            (steps.length ? 100 * shown / steps.length : 100) + "%";
+        if (shown >= steps.length) {
+            next.parentNode.hidden = true;
+            document.getElementById("done").hidden = false;
+        } else {
+            next.textContent = labels.next + " " + (shown + 1);
+        }
+    }
+    next.addEventListener("click", function () {
+        steps[shown].hidden = false;
+        shown += 1;
+        update();
+    });
+    update();
+})();
+"""
+
+
+def _page(title: str, lang: str, body: str, fonts: str) -> str:
+    return f"""<!DOCTYPE html>
+<html lang="{lang.lower()}">
+<head>
+<meta charset="utf-8">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<title>{html.escape(title)}</title>
+<style>
+{fonts}{markup.CSS}
+{BUNDLE_CSS}
+</style>
+</head>
+<body>
+<div class="block-container">
+    <div class="app-header"><h1>MathStep Tutor</h1></div>
+{body}
+</div>
+</body>
+</html>
+"""
+
+
+def bundle_html(problem: str, result: dict, lang: str = "TH", fonts: Optional[str] = None) -> str:
+    """Render one solved problem as a page with in-page step reveal.
+
+    By default the fonts are inlined so the single file works on its own;
+    `fonts` overrides the @font-face CSS (e.g. to link a shared fonts/ dir).
+    """
+    labels = LANG[lang]
+    steps = result.get("steps", [])
+    step_cards = "".join(
+        f'<div class="bundle-step" hidden>{markup.step_html(step, i, i == len(steps) - 1)}</div>'
+        for i, step in enumerate(steps)
+    )
+    js_labels = json.dumps(
+        {"step": labels["step_label"], "next": labels["next_step"]}, ensure_ascii=False
+    ).replace("</", "<\\/")
+    body = f"""
+    <div class="problem-text">{labels["problem_label"]}: {html.escape(problem)}</div>
+    {markup.legend_html(labels)}
+    {markup.analysis_html(result, labels)}
+    {markup.equation_html(result.get("equation", ""), labels)}
+    <div class="progress-text" id="progress"></div>
+    <div class="progress-bar"><div id="bar"></div></div>
+    {step_cards}
+    <div class="next-btn"><button id="next" type="button"></button></div>
+    <div id="done" hidden>{markup.done_html(labels)}</div>
+    <script type="application/json" id="labels">{js_labels}</script>
+    <script>{REVEAL_JS}</script>
+    """
+    if fonts is None:
+        fonts = markup.embedded_font_css()
+    return _page(problem, lang, body, fonts)
+
+
+def export_bundles(items: list, out_dir: str) -> list:
+    """Write one page per solved problem plus an index.html; return the written paths.
+
+    The self-hosted fonts (if built with build_assets.py) are copied alongside
+    and shared by all pages; otherwise the pages use system fonts.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    fonts = ""
+    if markup.FONTS_BUILT:
+        fonts = markup.font_css("")
+        shutil.copytree(
+            os.path.join(markup.STATIC_DIR, "fonts"),
+            os.path.join(out_dir, "fonts"),
+            dirs_exist_ok=True,
+        )
+    paths, links = [], []
+    for n, item in enumerate(items, start=1):
+        lang = item.get("lang", "TH")
+        name = f"problem-{n:03d}.html"
+        path = os.path.join(out_dir, name)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(bundle_html(item["problem"], item["result"], lang, fonts))
+        paths.append(path)
+        links.append(
+            f'<a class="index-link" href="{name}">{n}. {html.escape(item["problem"][:80])}</a>'
+        )
+
+    # The index takes the language most of the lessons are in
+    langs = [item.get("lang", "TH") for item in items] or ["TH"]
+    index_lang = max(set(langs), key=langs.count)
+    index_path = os.path.join(out_dir, "index.html")
+    with open(index_path, "w", encoding="utf-8") as f:
+        f.write(_page("MathStep Tutor", index_lang, "\n".join(links), fonts))
+    paths.append(index_path)
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export solved problems as static HTML lessons.")
+    parser.add_argument("solved", help="JSON file with a list of {problem, lang, result}")
+    parser.add_argument("out_dir", help="directory to write the HTML files into")
+    args = parser.parse_args()
+
+    with open(args.solved, encoding="utf-8") as f:
+        items = json.load(f)
+    paths = export_bundles(items, args.out_dir)
+    print(f"Wrote {len(paths)} files to {args.out_dir}")
+
+
+if __name__ == "__main__":
+    main()
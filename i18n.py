@@ -0,0 +1,100 @@
+"""
+i18n — Bilingual labels (TH / EN)
+"""
+
+LANG = {
+    "TH": {
+        "subtitle": "เครื่องมือฝึกวิเคราะห์โจทย์ & สอนวิธีทำทีละขั้นตอน",
+        "lang_toggle": "🇬🇧 English",
+        "api_title": "🔑 ตั้งค่า API Key",
+        "api_placeholder": "วาง API Key ของคุณที่นี่...",
+        "api_help": "รับ API Key ฟรีได้ที่ Google AI Studio (aistudio.google.com)",
+        "api_save": "✅  บันทึก API Key",
+        "api_warn": "กรุณากรอก API Key",
+        "sidebar_settings": "⚙️ ตั้งค่า",
+        "sidebar_change_key": "🔄 เปลี่ยน API Key",
+        "sidebar_metrics": "📊 สถิติโมเดล",
+        "sidebar_download_solved": "💾 ดาวน์โหลดโจทย์ที่ทำแล้ว (solved.json)",
+        "sidebar_download_solved_help": "ใช้กับ python export_static.py solved.json out_dir/",
+        "legend_data": "ข้อมูลจากโจทย์",
+        "legend_op": "เครื่องหมายคำนวณ",
+        "legend_result": "ผลลัพธ์ขั้นตอน",
+        "legend_answer": "คำตอบสุดท้าย",
+        "input_title": "✏️ ป้อนโจทย์คณิตศาสตร์",
+        "input_placeholder": "เช่น: แม่ค้าซื้อส้ม 5 กิโลกรัม กิโลกรัมละ 40 บาท และซื้อแอปเปิ้ล 3 กิโลกรัม กิโลกรัมละ 75 บาท แม่ค้าต้องจ่ายเงินทั้งหมดเท่าไร?",
+        "upload_label": "📷 หรืออัปโหลดรูปโจทย์",
+        "upload_caption": "รูปโจทย์ที่อัปโหลด",
+        "submit": "🚀  วิเคราะห์โจทย์",
+        "warn_empty": "กรุณาพิมพ์โจทย์หรืออัปโหลดรูปภาพ",
+        "spinner": "🤔 กำลังวิเคราะห์โจทย์...",
+        "err_json": "ไม่สามารถอ่านคำตอบจาก AI ได้ กรุณาลองใหม่อีกครั้ง",
+        "err_generic": "เกิดข้อผิดพลาด",
+        "problem_label": "📝 โจทย์",
+        "new_problem": "🔄 โจทย์ใหม่",
+        "analysis_title": "🔍 การวิเคราะห์โจทย์",
+        "topic_label": "📌 หัวข้อ",
+        "given_label": "📥 สิ่งที่โจทย์บอก",
+        "find_label": "❓ สิ่งที่โจทย์ถาม",
+        "keywords_label": "🔑 คีย์เวิร์ดสำคัญ",
+        "logic_label": "🧠 ตรรกะเบื้องหลัง",
+        "equation_label": "📝 สมการ",
+        "step_label": "ขั้นตอน",
+        "next_step": "👉  ดูขั้นตอนที่",
+        "all_done": "แสดงครบทุกขั้นตอนแล้ว!",
+        "all_done_sub": "ลองทำโจทย์ใหม่เพื่อฝึกฝนเพิ่มเติม",
+        "start_new": "✏️  เริ่มโจทย์ใหม่",
+        "download_lesson": "💾  ดาวน์โหลดบทเรียน (HTML ออฟไลน์)",
+        "image_prompt": "\n\nช่วยอ่านโจทย์จากรูปภาพนี้แล้ววิเคราะห์ให้หน่อย",
+        "extra_text": "\n\nข้อความเพิ่มเติม: ",
+        "image_fallback": "(โจทย์จากรูปภาพ)",
+        "budget_hint": "\n\n(ตอบให้กระชับ ใช้ไม่เกิน {steps} ขั้นตอน)",
+        "continue_prompt": "คำตอบถูกตัดกลางคัน ให้เขียน JSON ต่อจากจุดที่หยุดทันที ห้ามเริ่มใหม่และห้ามทวนข้อความเดิม",
+    },
+    "EN": {
+        "subtitle": "Analyze problems & learn step-by-step solutions",
+        "lang_toggle": "🇹🇭 ภาษาไทย",
+        "api_title": "🔑 Set API Key",
+        "api_placeholder": "Paste your API Key here...",
+        "api_help": "Get a free API Key at Google AI Studio (aistudio.google.com)",
+        "api_save": "✅  Save API Key",
+        "api_warn": "Please enter an API Key",
+        "sidebar_settings": "⚙️ Settings",
+        "sidebar_change_key": "🔄 Change API Key",
+        "sidebar_metrics": "📊 Model stats",
+        "sidebar_download_solved": "💾 Download solved problems (solved.json)",
+        "sidebar_download_solved_help": "For python export_static.py solved.json out_dir/",
+        "legend_data": "Data from problem",
+        "legend_op": "Operators",
+        "legend_result": "Step result",
+        "legend_answer": "Final answer",
+        "input_title": "✏️ Enter a Math Problem",
+        "input_placeholder": "e.g.: A shopkeeper buys 5 kg of oranges at $2 per kg and 3 kg of apples at $3.50 per kg. How much does she pay in total?",
+        "upload_label": "📷 Or upload an image of the problem",
+        "upload_caption": "Uploaded problem image",
+        "submit": "🚀  Analyze Problem",
+        "warn_empty": "Please type a problem or upload an image",
+        "spinner": "🤔 Analyzing the problem...",
+        "err_json": "Could not parse AI response. Please try again.",
+        "err_generic": "Error",
+        "problem_label": "📝 Problem",
+        "new_problem": "🔄 New Problem",
+        "analysis_title": "🔍 Problem Analysis",
+        "topic_label": "📌 Topic",
+        "given_label": "📥 Given",
+        "find_label": "❓ Find",
+        "keywords_label": "🔑 Keywords",
+        "logic_label": "🧠 Logic Behind",
+        "equation_label": "📝 Equation",
+        "step_label": "Step",
+        "next_step": "👉  Show Step",
+        "all_done": "All steps revealed!",
+        "all_done_sub": "Try a new problem to keep practicing",
+        "start_new": "✏️  Start New Problem",
+        "download_lesson": "💾  Download Lesson (offline HTML)",
+        "image_prompt": "\n\nPlease read the problem from this image and analyze it.",
+        "extra_text": "\n\nAdditional context: ",
+        "image_fallback": "(Problem from image)",
+        "budget_hint": "\n\n(Keep it concise: use at most {steps} steps.)",
+        "continue_prompt": "Your reply was cut off. Continue the JSON exactly where it stopped — do not restart or repeat any earlier text.",
+    },
+}
@@ -0,0 +1,208 @@
+"""
+Image dedup — จำผลเฉลยของรูปโจทย์ที่เคยวิเคราะห์แล้ว
+(ส่งรูปใบงานเดิมซ้ำ → ใช้ผลเฉลยเดิม ไม่ต้องเรียก Gemini อีก)
+
+Worksheets are mostly white paper, so whole-page perceptual hashes barely
+change when only the numbers on a page change. Each image is first
+normalised: if a darker background (desk) surrounds the sheet, the page
+outline is found and warped flat; the remaining tilt is estimated from
+the text lines and rotated out; the page is then cropped to its ink and
+resized to MASK_SIZE². Matching is done in two stages:
+
+1. A 1024-bit ink-density grid hash picks the few nearest candidates by
+   Hamming distance (a vectorised scan over one numpy array).
+2. Each candidate's stored ink mask is compared with the new image tile by
+   tile, letting every tile shift a few pixels to absorb what
+   normalisation leaves over. One tile that doesn't line up — a changed
+   digit — rejects the match.
+
+Re-encoded and resized copies, photos tilted by up to ±5°, and sheets
+photographed on a darker desk match; the same template with different
+numbers does not. Strong perspective, curled paper or a cluttered
+background usually miss and are simply solved again, which is the safe
+direction to fail in.
+"""
+
+import json
+import sys
+import threading
+import zlib
+from typing import Optional
+
+import numpy as np
+from PIL import Image, ImageFilter, ImageOps
+
+MASK_SIZE = 256  # normalised page size (pixels) for the ink mask
+GRID = 32  # hash grid → GRID² bits
+HASH_BYTES = GRID * GRID // 8
+TILE = 32  # verification tile size
+MAX_SHIFT = 4  # per-tile alignment search, ± pixels
+
+
+def _rectify_page(gray: Image.Image) -> Image.Image:
+    """Warp the sheet flat if a darker background surrounds it; otherwise return `gray`."""
+    small = gray.copy()
+    small.thumbnail((256, 256))
+    a = np.asarray(small, dtype=np.float32)
+    paper = np.percentile(a, 95)
+    desk = np.median(np.concatenate([a[0], a[-1], a[:, 0], a[:, -1]]))
+    if desk > 0.8 * paper:
+        return gray  # the page fills the frame (or lies on a white surface)
+
+    # Pixels nearer paper than desk brightness are the sheet; the opening drops specks
+    bright = Image.fromarray(((a > (desk + paper) / 2) * 255).astype(np.uint8))
+    bright = bright.filter(ImageFilter.MinFilter(5)).filter(ImageFilter.MaxFilter(5))
+    ys, xs = np.nonzero(np.asarray(bright))
+    if len(xs) < 0.1 * a.size:
+        return gray
+
+    # Corners are the extremes of x+y and x−y for a sheet tilted less than 45°
+    s, d = xs + ys, xs - ys
+    corners = [(xs[i], ys[i]) for i in (s.argmin(), d.argmin(), s.argmax(), d.argmax())]
+    sx, sy = gray.width / small.width, gray.height / small.height
+    tl, bl, br, tr = [((x + 0.5) * sx, (y + 0.5) * sy) for x, y in corners]
+    w = int(max(np.hypot(*np.subtract(tr, tl)), np.hypot(*np.subtract(br, bl))))
+    h = int(max(np.hypot(*np.subtract(bl, tl)), np.hypot(*np.subtract(br, tr))))
+    page = gray.transform(
+        (w, h), Image.Transform.QUAD, (*tl, *bl, *br, *tr), Image.Resampling.BILINEAR
+    )
+    inset = max(w, h) // 40  # corners are only found to a few pixels; drop the desk edge
+    return page.crop((inset, inset, w - inset, h - inset))
+
+
+def _skew_angle(gray: Image.Image) -> float:
+    """Angle (degrees, for Image.rotate) that levels the text lines, within ±5°.
+
+    Ink pixels are projected onto rows along each candidate angle; the rows
+    are sharpest (largest sum of squared counts) when lines are level.
+    """
+    ys, xs = np.nonzero(np.asarray(gray) < 128)
+    if len(xs) < 100:
+        return 0.0
+    ys, xs = ys.astype(np.float64), xs.astype(np.float64)
+
+    def sharpness(angle):
+        rows = ys - xs * np.tan(np.radians(angle))
+        counts = np.bincount((rows - rows.min()).astype(np.int64)).astype(np.float64)
+        return float(np.square(counts).sum())
+
+    coarse = max(np.arange(-5, 5.01, 0.25), key=sharpness)
+    return float(max(np.arange(coarse - 0.2, coarse + 0.21, 0.05), key=sharpness))
+
+
+def fingerprint(image: Image.Image) -> tuple:
+    """Return (grid hash, ink mask) for an image.
+
+    The hash is a packed uint8 array of GRID² bits; the mask is a bool
+    array of MASK_SIZE² marking ink pixels on the levelled, cropped page.
+    """
+    gray = ImageOps.exif_transpose(image).convert("L")
+    gray.thumbnail((1024, 1024))
+    gray = ImageOps.autocontrast(_rectify_page(ImageOps.autocontrast(gray, cutoff=1)), cutoff=1)
+    gray = gray.rotate(_skew_angle(gray), Image.Resampling.BICUBIC, expand=True, fillcolor=255)
+    box = gray.point(lambda p: 255 if p < 128 else 0).getbbox()
+    if box:
+        gray = gray.crop(box)
+    mask = np.asarray(gray.resize((MASK_SIZE, MASK_SIZE), Image.Resampling.BOX)) < 160
+
+    block = MASK_SIZE // GRID
+    density = mask.reshape(GRID, block, GRID, block).mean(axis=(1, 3))
+    return np.packbits(density > 0.08), mask
+
+
+def _dilate(mask: np.ndarray) -> np.ndarray:
+    img = Image.fromarray(mask.astype(np.uint8) * 255)
+    return np.asarray(img.filter(ImageFilter.MaxFilter(3))) > 0
+
+
+def mask_distance(a: np.ndarray, b: np.ndarray) -> float:
+    """Worst per-tile share of ink that can't be aligned between two masks (0 = same)."""
+    da, db = _dilate(a), _dilate(b)
+    pb = np.pad(b, MAX_SHIFT)
+    pdb = np.pad(db, MAX_SHIFT)
+    n = MASK_SIZE // TILE
+
+    def tile_sums(m):
+        return m.reshape(n, TILE, n, TILE).sum(axis=(1, 3))
+
+    best = None
+    span = 2 * MAX_SHIFT + 1
+    for sy in range(span):
+        for sx in range(span):
+            bs = pb[sy:sy + MASK_SIZE, sx:sx + MASK_SIZE]
+            dbs = pdb[sy:sy + MASK_SIZE, sx:sx + MASK_SIZE]
+            miss = tile_sums(a & ~dbs) + tile_sums(bs & ~da)
+            best = miss if best is None else np.minimum(best, miss)
+
+    ink = tile_sums(a) + tile_sums(b)
+    return float((best / np.maximum(ink, TILE)).max())
+
+
+class ImageIndex:
+    """Thread-safe near-duplicate index from page image → solved result.
+
+    Hashes live in one growable `(n, HASH_BYTES)` uint8 array so a lookup
+    is a single vectorised XOR/popcount over every entry. Ink masks and
+    results are stored zlib-compressed (about 0.7 KB per mask). `context`
+    (language + any typed text) must match exactly for a hit, since the
+    same photo with a different question or language needs a different
+    answer.
+    """
+
+    def __init__(self, max_hash_distance: int = 96, max_mask_distance: float = 0.08,
+                 max_candidates: int = 8, max_items: int = 200_000):
+        self.max_hash_distance = max_hash_distance
+        self.max_mask_distance = max_mask_distance
+        self.max_candidates = max_candidates
+        self.max_items = max_items
+        self._size = 0
+        self._hashes = np.zeros((1024, HASH_BYTES), dtype=np.uint8)
+        self._context_ids = np.zeros(1024, dtype=np.int32)
+        self._contexts: dict = {}
+        self._masks: list = []
+        self._results: list = []
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self._size
+
+    def lookup(self, fp: tuple, context: str) -> Optional[dict]:
+        """Return a copy of a stored result whose page matches `fp`, if any."""
+        value, mask = fp
+        with self._lock:
+            ctx = self._contexts.get(context)
+            if ctx is None:
+                return None
+            dist = np.bitwise_count(self._hashes[:self._size] ^ value).sum(axis=1)
+            dist[self._context_ids[:self._size] != ctx] = np.iinfo(dist.dtype).max
+            rows = np.argsort(dist, kind="stable")[:self.max_candidates]
+            rows = [int(r) for r in rows if dist[r] <= self.max_hash_distance]
+            stored = [(r, self._masks[r]) for r in rows]
+
+        # Verification is the slow part; run it outside the lock
+        for row, packed in stored:
+            candidate = np.unpackbits(
+                np.frombuffer(zlib.decompress(packed), dtype=np.uint8)
+            )[:MASK_SIZE * MASK_SIZE].reshape(MASK_SIZE, MASK_SIZE).astype(bool)
+            if mask_distance(mask, candidate) <= self.max_mask_distance:
+                return json.loads(zlib.decompress(self._results[row]))
+        return None
+
+    def add(self, fp: tuple, context: str, result: dict):
+        """Store a solved result; silently ignored once `max_items` is reached."""
+        value, mask = fp
+        packed_mask = zlib.compress(np.packbits(mask).tobytes())
+        payload = zlib.compress(json.dumps(result, ensure_ascii=False).encode("utf-8"))
+        with self._lock:
+            if self._size >= self.max_items:
+                return
+            if self._size == len(self._hashes):
+                grow = len(self._hashes)
+                self._hashes = np.concatenate([self._hashes, np.zeros_like(self._hashes[:grow])])
+                self._context_ids = np.concatenate([self._context_ids, np.zeros(grow, dtype=np.int32)])
+            ctx = self._contexts.setdefault(sys.intern(context), len(self._contexts))
+            self._hashes[self._size] = value
+            self._context_ids[self._size] = ctx
+            self._masks.append(packed_mask)
+            self._results.append(payload)
+            self._size += 1
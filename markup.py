@@ -0,0 +1,112 @@
+"""
+Markup — HTML ของการ์ดวิเคราะห์/สมการ/ขั้นตอน
+(ใช้ร่วมกันระหว่างแอป Streamlit และ export_static.py)
+"""
+
+import base64
+import os
+import re
+
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static")
+
+# CSS — Mac + iPad optimised, responsive
+with open(os.path.join(STATIC_DIR, "style.css"), encoding="utf-8") as f:
+    CSS = f.read()
+
+# Self-hosted fonts from build_assets.py (committed); without them the CSS
+# font stacks fall back to system fonts rather than a render-blocking @import
+FONTS_CSS_PATH = os.path.join(STATIC_DIR, "fonts.css")
+FONTS_BUILT = os.path.exists(FONTS_CSS_PATH)
+if FONTS_BUILT:
+    with open(FONTS_CSS_PATH, encoding="utf-8") as f:
+        _FONTS_CSS = f.read()
+
+
+def font_css(base_url: str) -> str:
+    """@font-face rules with font URLs resolved against `base_url`."""
+    if not FONTS_BUILT:
+        return ""
+    return _FONTS_CSS.replace('url("fonts/', f'url("{base_url}fonts/')
+
+
+_embedded_font_css = None
+
+
+def embedded_font_css() -> str:
+    """@font-face rules with the woff2 files inlined as data: URIs, for single-file pages.
+
+    Empty when the fonts aren't built, so the page uses system fonts.
+    """
+    global _embedded_font_css
+    if not FONTS_BUILT:
+        return ""
+    if _embedded_font_css is None:
+        def inline(m):
+            with open(os.path.join(STATIC_DIR, "fonts", m.group(1)), "rb") as f:
+                data = base64.b64encode(f.read()).decode("ascii")
+            return f'url("data:font/woff2;base64,{data}")'
+
+        _embedded_font_css = re.sub(r'url\("fonts/([^"]+)"\)', inline, _FONTS_CSS)
+    return _embedded_font_css
+
+
+def legend_html(labels: dict) -> str:
+    return f"""
+    <div class="legend">
+        <div class="legend-item"><span class="legend-dot" style="background:#2E86C1;"></span> {labels["legend_data"]}</div>
+        <div class="legend-item"><span class="legend-dot" style="background:#E67E22;"></span> {labels["legend_op"]}</div>
+        <div class="legend-item"><span class="legend-dot" style="background:#27AE60;"></span> {labels["legend_result"]}</div>
+        <div class="legend-item"><span class="legend-dot" style="background:#E74C3C;"></span> {labels["legend_answer"]}</div>
+    </div>
+    """
+
+
+def analysis_html(data: dict, labels: dict) -> str:
+    a = data.get("analysis", {})
+    return f"""
+    <div class="analysis-card animate-in">
+        <div class="card-title">{labels["analysis_title"]}</div>
+        <div class="analysis-row"><strong>{labels["topic_label"]}:</strong> {data.get("topic", "-")}</div>
+        <div class="analysis-row"><strong>{labels["given_label"]}:</strong> {a.get("given", "-")}</div>
+        <div class="analysis-row"><strong>{labels["find_label"]}:</strong> {a.get("find", "-")}</div>
+        <div class="analysis-row"><strong>{labels["keywords_label"]}:</strong> {a.get("keywords", "-")}</div>
+        <div class="analysis-row"><strong>{labels["logic_label"]}:</strong> {a.get("logic", "-")}</div>
+    </div>
+    """
+
+
+def equation_html(eq: str, labels: dict) -> str:
+    """Equation box, or an empty string when the problem has no equation."""
+    if eq and eq.strip() and eq.strip() != "-":
+        return f"""
+        <div class="equation-box animate-in">
+            {labels["equation_label"]}: {eq}
+        </div>
+        """
+    return ""
+
+
+def step_html(step: dict, index: int, is_last: bool) -> str:
+    num_class = "step-number final" if is_last else "step-number"
+    card_class = "step-card final animate-in" if is_last else "step-card animate-in"
+    return f"""
+    <div class="{card_class}">
+        <div style="display:flex;align-items:flex-start;gap:0.4rem;margin-bottom:0.5rem;">
+            <span class="{num_class}">{index + 1}</span>
+            <strong style="font-size:1.1rem;line-height:34px;">{step.get("title", "")}</strong>
+        </div>
+        <div style="font-size:1.08rem;line-height:1.85;">
+            {step.get("explanation", "")}
+        </div>
+    </div>
+    """
+
+
+def done_html(labels: dict) -> str:
+    return f"""
+    <div class="done-card">
+        <div style="font-size:1.8rem;margin-bottom:0.4rem;">🎉</div>
+        <div style="font-size:1.2rem;font-weight:600;color:#27AE60;">{labels["all_done"]}</div>
+        <div style="font-size:1rem;color:#888;margin-top:0.3rem;">{labels["all_done_sub"]}</div>
+    </div>
+    """
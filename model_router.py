@@ -0,0 +1,172 @@
+"""
+Model router — เลือกระดับโมเดลตามความยากของโจทย์
+(โจทย์ง่ายใช้โมเดลเร็ว/ถูก, โจทย์ยากใช้โมเดลที่เก่งกว่า)
+"""
+
+import copy
+import re
+import threading
+from collections.abc import Mapping
+from typing import Optional
+
+# ──────────────────────────────────────────────
+# Default configuration
+# ──────────────────────────────────────────────
+# Tiers are ordered cheapest → strongest. A problem is routed to the first
+# tier whose `max_score` is >= its difficulty score; `None` means no limit.
+DEFAULT_CONFIG = {
+    "tiers": [
+        {"name": "fast", "model": "gemini-2.5-flash-lite", "max_score": 1},
+        {"name": "standard", "model": "gemini-2.5-flash", "max_score": 4},
+        {"name": "strong", "model": "gemini-2.5-pro", "max_score": None},
+    ],
+    "medium_length": 120,
+    "long_length": 320,
+    "image_weight": 2,
+    "advanced_topic_weight": 3,
+    "intermediate_topic_weight": 1,
+    "parse_failure_weight": 1,
+    "max_parse_failure_bonus": 3,
+}
+
+# Keywords (TH + EN) that hint at the kind of maths involved
+ADVANCED_TOPICS = re.compile(
+    r"อนุพันธ์|ปริพันธ์|อินทิกรัล|ลิมิต|ตรีโกณ|ลอการิทึม|เมทริกซ์|เวกเตอร์|"
+    r"ความน่าจะเป็น|พิสูจน์|จำนวนเชิงซ้อน|"
+    r"\b(?:derivative|differentiate|integral|integrate|limit|matrix|matrices|"
+    r"vector|probability|prove|proof|logarithm|log|ln|sin|cos|tan|complex)\b|"
+    r"[∫∑√∂]|d/dx",
+    re.IGNORECASE,
+)
+INTERMEDIATE_TOPICS = re.compile(
+    r"สมการ|อสมการ|เศษส่วน|ร้อยละ|เปอร์เซ็นต์|อัตราส่วน|ดอกเบี้ย|พื้นที่|ปริมาตร|"
+    r"\b(?:equation|inequality|fraction|percent|ratio|interest|area|volume|"
+    r"quadratic|simultaneous|system)\b|"
+    r"[%^²³≤≥<>]|\b[a-z]\s*=",
+    re.IGNORECASE,
+)
+
+
+NUMERIC_KEYS = (
+    "medium_length",
+    "long_length",
+    "image_weight",
+    "advanced_topic_weight",
+    "intermediate_topic_weight",
+    "parse_failure_weight",
+    "max_parse_failure_bonus",
+)
+
+
+def _is_number(value) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def load_config(overrides: Optional[dict] = None) -> dict:
+    """Merge user overrides (from secrets / env) onto the default config.
+
+    Raises ValueError if the result isn't a usable config.
+    """
+    config = copy.deepcopy(DEFAULT_CONFIG)
+    if overrides:
+        if not isinstance(overrides, Mapping):
+            raise ValueError("Router config must be an object")
+        config.update(copy.deepcopy(dict(overrides)))
+
+    tiers = config["tiers"]
+    if not isinstance(tiers, list) or not tiers:
+        raise ValueError("Router config must define a non-empty list of model tiers")
+    for i, tier in enumerate(tiers):
+        if not isinstance(tier, Mapping):
+            raise ValueError(f"Tier {i} must be an object")
+        tier = tiers[i] = dict(tier)
+        for key in ("name", "model"):
+            if not isinstance(tier.get(key), str) or not tier[key]:
+                raise ValueError(f"Tier {i} needs a non-empty string '{key}'")
+        if tier.get("max_score") is not None and not _is_number(tier["max_score"]):
+            raise ValueError(f"Tier {i} 'max_score' must be a number or null")
+    for key in NUMERIC_KEYS:
+        if not _is_number(config[key]):
+            raise ValueError(f"Router config '{key}' must be a number")
+    return config
+
+
+# ──────────────────────────────────────────────
+# Classification
+# ──────────────────────────────────────────────
+def difficulty_score(
+    problem_text: str,
+    has_image: bool,
+    parse_failures: int,
+    config: dict,
+) -> int:
+    """Score a submission locally from cheap signals; higher means harder."""
+    text = problem_text.strip()
+    score = 0
+
+    if len(text) >= config["long_length"]:
+        score += 2
+    elif len(text) >= config["medium_length"]:
+        score += 1
+
+    if has_image:
+        score += config["image_weight"]
+
+    if ADVANCED_TOPICS.search(text):
+        score += config["advanced_topic_weight"]
+    elif INTERMEDIATE_TOPICS.search(text):
+        score += config["intermediate_topic_weight"]
+
+    score += min(
+        parse_failures * config["parse_failure_weight"],
+        config["max_parse_failure_bonus"],
+    )
+    return score
+
+
+def route(
+    problem_text: str,
+    has_image: bool,
+    parse_failures: int,
+    config: dict,
+) -> list:
+    """Return the tiers to try, starting at the routed tier and escalating upward."""
+    score = difficulty_score(problem_text, has_image, parse_failures, config)
+    tiers = config["tiers"]
+    for i, tier in enumerate(tiers):
+        max_score = tier.get("max_score")
+        if max_score is None or score <= max_score:
+            return tiers[i:]
+    return tiers[-1:]
+
+
+# ──────────────────────────────────────────────
+# Per-tier metrics (shared across sessions)
+# ──────────────────────────────────────────────
+_metrics: dict = {}
+_metrics_lock = threading.Lock()
+
+
+def record(tier_name: str, ok: bool, latency: float):
+    """Record one call's outcome and latency (seconds) against a tier."""
+    with _metrics_lock:
+        m = _metrics.setdefault(
+            tier_name, {"calls": 0, "successes": 0, "latency_total": 0.0}
+        )
+        m["calls"] += 1
+        m["successes"] += int(ok)
+        m["latency_total"] += latency
+
+
+def metrics_summary() -> list:
+    """Return per-tier call count, success rate and mean latency."""
+    with _metrics_lock:
+        rows = []
+        for name, m in _metrics.items():
+            rows.append({
+                "tier": name,
+                "calls": m["calls"],
+                "success_rate": round(m["successes"] / m["calls"], 3),
+                "avg_latency_s": round(m["latency_total"] / m["calls"], 2),
+            })
+        return rows
@@ -0,0 +1,163 @@
+"""
+Output budget — กำหนดความยาวคำตอบตามความซับซ้อนของโจทย์
+(โจทย์ง่ายได้คำตอบสั้น → เร็วขึ้น; ถ้าถูกตัดกลางคันจะขอให้เขียนต่อ ไม่เริ่มใหม่)
+"""
+
+import logging
+import re
+from typing import Optional
+
+import google.generativeai as genai
+
+import model_router
+import solver
+from i18n import LANG
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUDGET = {
+    "min_steps": 2,
+    "max_steps": 8,
+    "image_steps": 5,  # can't see inside an image locally, so assume a mid-size problem
+    "analysis_tokens": 400,  # topic + analysis + equation
+    "step_tokens": {"TH": 260, "EN": 180},  # Thai and the colour <span>s cost more tokens
+    # 2.5 models (except lite) spend output tokens on thinking before answering, more
+    # for longer problems; pro can't turn thinking off and thinks the longest
+    "thinking_tokens": {
+        "gemini-2.5-flash-lite": {"base": 0, "per_step": 0},
+        "gemini-2.5-pro": {"base": 1024, "per_step": 512},
+        "default": {"base": 512, "per_step": 256},
+    },
+    "temperature": 0.3,
+    "max_continuations": 2,
+    "max_restarts": 1,  # retries with a bigger cap when thinking used up the whole budget
+}
+
+NUMBER = re.compile(r"\d+(?:[.,]\d+)*")
+CONTINUATION_FENCE = re.compile(r"^\s*```(?:json)?[ \t]*\n?")
+
+
+def estimate_steps(problem_text: str, has_image: bool, config: dict = DEFAULT_BUDGET) -> int:
+    """Guess how many solution steps a problem needs from its quantities and topic."""
+    text = problem_text.strip()
+    if has_image and not text:
+        return config["image_steps"]
+
+    # One step to set up, one to answer, roughly one per pair of given quantities
+    steps = 2 + max(len(NUMBER.findall(text)) - 1, 0) // 2
+    steps += max(text.count("?") - 1, 0)
+    if model_router.ADVANCED_TOPICS.search(text):
+        steps += 2
+    if has_image:
+        steps = max(steps, config["image_steps"])
+    return max(config["min_steps"], min(steps, config["max_steps"]))
+
+
+def plan(problem_text: str, has_image: bool, lang: str, model_name: str,
+         config: dict = DEFAULT_BUDGET) -> dict:
+    """Return the step target, token cap, temperature and prompt hint for one request."""
+    steps = estimate_steps(problem_text, has_image, config)
+    reserve = config["thinking_tokens"].get(model_name, config["thinking_tokens"]["default"])
+    thinking = reserve["base"] + steps * reserve["per_step"]
+    return {
+        "steps": steps,
+        "thinking_tokens": thinking,
+        "max_output_tokens": config["analysis_tokens"] + steps * config["step_tokens"][lang] + thinking,
+        "temperature": config["temperature"],
+        "hint": LANG[lang]["budget_hint"].format(steps=steps),
+    }
+
+
+def generation_config(budget: dict, scale: Optional[int] = 1) -> genai.GenerationConfig:
+    """Generation settings for `budget`; `scale=None` leaves output uncapped."""
+    return genai.GenerationConfig(
+        max_output_tokens=None if scale is None else budget["max_output_tokens"] * scale,
+        temperature=budget["temperature"],
+    )
+
+
+def _response_text(response) -> str:
+    try:
+        return response.text
+    except ValueError:  # no text parts, e.g. the whole budget went to thinking
+        return ""
+
+
+def output_tokens(response) -> tuple:
+    """(all output tokens, thinking tokens) of a response.
+
+    `candidates_token_count` excludes thinking, while `max_output_tokens`
+    covers both, so the total is compared against the cap.
+    """
+    usage = response.usage_metadata
+    if not usage:
+        return 0, 0
+    total = max(usage.total_token_count - usage.prompt_token_count, usage.candidates_token_count)
+    return total, total - usage.candidates_token_count
+
+
+def is_truncated(response) -> bool:
+    return bool(response.candidates) and (
+        response.candidates[0].finish_reason == genai.protos.Candidate.FinishReason.MAX_TOKENS
+    )
+
+
+def generate(model: genai.GenerativeModel, parts: list, lang: str, budget: dict,
+             config: dict = DEFAULT_BUDGET, final: bool = False) -> str:
+    """Generate within `budget`, continuing a cut-off reply instead of restarting it.
+
+    `final` marks the last tier: once its restarts are used up it gets one
+    more try without an output cap, since there is nothing left to escalate to.
+    """
+    contents = [{"role": "user", "parts": parts + [budget["hint"]]}]
+    text, used, thinking, continuations, restarts, scale = "", 0, 0, 0, 0, 1
+
+    while True:
+        response = model.generate_content(
+            contents, generation_config=generation_config(budget, scale)
+        )
+        chunk = _response_text(response)
+        if text:
+            # A continuation often reopens the ```json fence; drop it so the reply still parses
+            text += CONTINUATION_FENCE.sub("", chunk)
+        else:
+            text = chunk
+        total, thought = output_tokens(response)
+        used += total
+        thinking += thought
+
+        if not is_truncated(response):
+            break
+        try:
+            solver.parse_reply(text)
+            break  # hit the cap right at the end of a complete reply
+        except ValueError:
+            pass
+
+        if chunk:
+            if continuations >= config["max_continuations"]:
+                break
+            continuations += 1
+            contents = contents + [
+                {"role": "model", "parts": [chunk]},
+                {"role": "user", "parts": [LANG[lang]["continue_prompt"]]},
+            ]
+        else:
+            # Thinking used the whole cap and nothing was written to continue
+            # from, so this is a restart of the same turn with more room
+            if scale is None or (restarts >= config["max_restarts"] and not final):
+                break
+            restarts += 1
+            scale = None if restarts > config["max_restarts"] else scale * 2
+
+    try:
+        steps_used = len(solver.parse_reply(text)["steps"])
+    except ValueError:
+        steps_used = None
+    logger.info(
+        "output budget: steps %s/%d, output tokens %d/%d (thinking %d, reserved %d), "
+        "continuations %d, restarts %d",
+        steps_used, budget["steps"], used, budget["max_output_tokens"], thinking,
+        budget["thinking_tokens"], continuations, restarts,
+    )
+    return text
@@ -0,0 +1,103 @@
+import json
+
+import pytest
+
+import benchmark
+import solver
+
+RED = "<span style='color:#E74C3C;font-weight:700;'>{}</span>"
+BLUE = "<span style='color:#2E86C1;font-weight:600;'>{}</span>"
+
+
+def result(*explanations):
+    return {"steps": [{"title": "", "explanation": e} for e in explanations]}
+
+
+def test_answer_read_from_red_span_only():
+    # The operands 2 and 3 appear in the step, but the red answer is wrong
+    reply = result(f"(x-{BLUE.format(2)})(x-{BLUE.format(3)}) = 0, so x = {RED.format('x = 1')}")
+    assert not benchmark.is_correct(reply, [2, 3])
+
+
+def test_all_answers_in_red_span():
+    reply = result("factor", f"(x-2)(x-3) = 0 → {RED.format('x = 2 or x = 3')}")
+    assert benchmark.is_correct(reply, [2, 3])
+
+
+def test_minus_after_operand_is_not_a_sign():
+    assert benchmark._numbers("(x-3)(x+2)") == [3, 2]
+    assert benchmark._numbers("x = -3, y = −1.5") == [-3, -1.5]
+
+
+def test_thousands_separator():
+    assert benchmark.is_correct(result(RED.format("1,200 บาท")), [1200])
+
+
+def test_no_red_span_is_incorrect():
+    assert not benchmark.is_correct(result("The answer is 425"), [425])
+
+
+def record_fixture(monkeypatch, tmp_path):
+    """Point the benchmark at tmp_path and record a correct reply for one text-only case."""
+    monkeypatch.setattr(benchmark, "FIXTURES_DIR", str(tmp_path))
+    variant = {"name": "flash", "model": "gemini-2.5-flash", "_instructions": dict(solver.SYSTEM_INSTRUCTIONS)}
+    case = next(c for c in benchmark.load_cases() if not c.get("image"))
+    answer = " , ".join(str(a) for a in case["answers"])
+    reply = json.dumps({
+        "topic": "t",
+        "analysis": {},
+        "equation": "",
+        "steps": [{"title": "s", "explanation": RED.format(answer)}],
+    })
+    recording = {
+        "request_hash": benchmark._request_hash(variant, case),
+        "model": variant["model"],
+        "chunks": [{"t": 0.4, "text": reply[:30]}, {"t": 0.9, "text": reply[30:]}],
+        "latency_s": 1.0,
+        "input_tokens": 120,
+        "output_tokens": 300,
+        "thinking_tokens": 100,
+        "budget_tokens": 2000,
+        "truncated": False,
+    }
+    path = tmp_path / variant["name"] / f"{case['id']}.json"
+    path.parent.mkdir()
+    path.write_text(json.dumps(recording), encoding="utf-8")
+    return variant, case
+
+
+def test_replay_scores_recorded_fixture(monkeypatch, tmp_path):
+    variant, case = record_fixture(monkeypatch, tmp_path)
+    assert benchmark.fixture_problem(variant, case) is None
+    row = benchmark.run_case(variant, case, "replay")
+    assert row["id"] == case["id"]
+    assert (row["parsed"], row["valid"], row["correct"]) == (True, True, True)
+    assert row["ttft_s"] == 0.4
+
+
+@pytest.mark.parametrize("change", [
+    {"model": "gemini-2.5-pro"},
+    {"_instructions": {"TH": "other prompt", "EN": "other prompt"}},
+])
+def test_replay_rejects_stale_fixture(monkeypatch, tmp_path, change):
+    variant, case = record_fixture(monkeypatch, tmp_path)
+    variant = {**variant, **change}
+    assert benchmark.fixture_problem(variant, case) == "stale"
+    with pytest.raises(ValueError, match="stale"):
+        benchmark.run_case(variant, case, "replay")
+
+
+def test_replay_reports_missing_fixture(monkeypatch, tmp_path):
+    variant, case = record_fixture(monkeypatch, tmp_path)
+    other = next(c for c in benchmark.load_cases() if c["id"] != case["id"])
+    assert benchmark.fixture_problem(variant, other) == "missing"
+
+
+def test_run_without_fixtures_exits_before_writing_reports(monkeypatch, tmp_path):
+    monkeypatch.setattr(benchmark, "FIXTURES_DIR", str(tmp_path / "fixtures"))
+    monkeypatch.setattr(benchmark, "REPORTS_DIR", str(tmp_path / "reports"))
+    monkeypatch.setattr("sys.argv", ["benchmark.py", "run", "--variant", "flash"])
+    with pytest.raises(SystemExit) as exc:
+        benchmark.main()
+    assert "missing or stale" in str(exc.value.code)
+    assert not (tmp_path / "reports").exists()
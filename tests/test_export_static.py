@@ -0,0 +1,34 @@
+import export_static
+
+RESULT = {
+    "topic": "Addition",
+    "analysis": {"given": "2 and 3", "find": "sum"},
+    "equation": "2 + 3",
+    "steps": [
+        {"title": "Add", "explanation": "2 + 3 = 5"},
+        {"title": "Answer", "explanation": "<span style='color:#E74C3C;'>5</span>"},
+    ],
+}
+
+
+def test_bundle_has_one_hidden_step_per_step_and_escapes_problem():
+    page = export_static.bundle_html("<b>2 + 3</b> & ?", RESULT, "EN")
+    assert page.count('<div class="bundle-step" hidden>') == len(RESULT["steps"])
+    assert "&lt;b&gt;2 + 3&lt;/b&gt; &amp; ?" in page
+    assert "<b>2 + 3</b>" not in page
+    assert "fonts.googleapis.com" not in page
+
+
+def test_export_writes_pages_and_index(tmp_path):
+    items = [
+        {"problem": "2 + 3", "lang": "EN", "result": RESULT},
+        {"problem": "4 + 5", "lang": "EN", "result": RESULT},
+    ]
+    paths = export_static.export_bundles(items, str(tmp_path))
+    assert sorted(p.name for p in tmp_path.glob("*.html")) == [
+        "index.html", "problem-001.html", "problem-002.html",
+    ]
+    assert len(paths) == 3
+    index = (tmp_path / "index.html").read_text(encoding="utf-8")
+    assert '<html lang="en">' in index
+    assert 'href="problem-002.html"' in index
@@ -0,0 +1,87 @@
+import io
+import random
+
+import pytest
+from PIL import Image, ImageDraw, ImageEnhance, ImageFont
+
+import image_dedup
+
+
+def worksheet(seed: int) -> Image.Image:
+    """Same template every time; only the numbers in the questions differ."""
+    rnd = random.Random(seed)
+    img = Image.new("RGB", (1240, 1754), "white")
+    draw = ImageDraw.Draw(img)
+    font = ImageFont.load_default(size=44)
+    draw.text((100, 100), "Worksheet 3", fill="black", font=font)
+    draw.text((100, 180), "Name: ____________   Class: ______", fill="black", font=font)
+    for i in range(6):
+        a, b = rnd.randint(2, 12), rnd.randint(2, 12)
+        draw.text((120, 300 + i * 200), f"{i + 1})  {a} x {b} = ______", fill="black", font=font)
+    return img
+
+
+def reshot(img: Image.Image) -> Image.Image:
+    """Smaller, darker, JPEG-compressed copy of the same page."""
+    img = img.resize((img.width * 3 // 4, img.height * 3 // 4))
+    img = ImageEnhance.Brightness(img).enhance(0.8)
+    buf = io.BytesIO()
+    img.save(buf, "JPEG", quality=50)
+    buf.seek(0)
+    return Image.open(buf)
+
+
+def tilted(img: Image.Image, angle: float) -> Image.Image:
+    return img.rotate(angle, Image.Resampling.BICUBIC, expand=True, fillcolor="white")
+
+
+def on_desk(img: Image.Image, angle: float = 0, shade: int = 110) -> Image.Image:
+    """Photo of the sheet lying slightly skewed on a grey desk."""
+    desk = (shade, shade, shade)
+    img = img.resize((img.width * 3 // 5, img.height * 3 // 5))
+    img = img.rotate(angle, Image.Resampling.BICUBIC, expand=True, fillcolor=desk)
+    photo = Image.new("RGB", (img.width + 300, img.height + 260), desk)
+    photo.paste(img, (140, 120))
+    return reshot(photo)
+
+
+def indexed(img: Image.Image, context: str = "TH\n") -> image_dedup.ImageIndex:
+    index = image_dedup.ImageIndex()
+    index.add(image_dedup.fingerprint(img), context, {"answer": "stored"})
+    return index
+
+
+def test_copy_of_same_sheet_matches():
+    index = indexed(worksheet(1))
+    assert index.lookup(image_dedup.fingerprint(reshot(worksheet(1))), "TH\n") == {"answer": "stored"}
+
+
+@pytest.mark.parametrize("angle", [1, 1.5, 2, -2])
+def test_tilted_photo_of_same_sheet_matches(angle):
+    index = indexed(worksheet(1))
+    assert index.lookup(image_dedup.fingerprint(reshot(tilted(worksheet(1), angle))), "TH\n") is not None
+
+
+@pytest.mark.parametrize("angle", [0, 1.5, -2])
+def test_sheet_on_darker_background_matches(angle):
+    index = indexed(worksheet(1))
+    assert index.lookup(image_dedup.fingerprint(on_desk(worksheet(1), angle)), "TH\n") is not None
+
+
+def test_same_layout_different_numbers_do_not_match():
+    index = indexed(worksheet(1))
+    for seed in range(2, 8):
+        assert index.lookup(image_dedup.fingerprint(worksheet(seed)), "TH\n") is None
+        assert index.lookup(image_dedup.fingerprint(reshot(tilted(worksheet(seed), 1.5))), "TH\n") is None
+        assert index.lookup(image_dedup.fingerprint(on_desk(worksheet(seed), 1)), "TH\n") is None
+
+
+def test_blank_page_does_not_match_filled_sheet():
+    index = indexed(worksheet(1))
+    blank = Image.new("RGB", (1240, 1754), "white")
+    assert index.lookup(image_dedup.fingerprint(blank), "TH\n") is None
+
+
+def test_context_must_match():
+    index = indexed(worksheet(1))
+    assert index.lookup(image_dedup.fingerprint(worksheet(1)), "EN\n") is None
@@ -0,0 +1,54 @@
+import pytest
+
+import model_router
+
+
+def config(**overrides):
+    return model_router.load_config(overrides)
+
+
+def names(tiers):
+    return [t["name"] for t in tiers]
+
+
+def test_easy_problem_routes_to_fast_tier():
+    assert names(model_router.route("2 + 3 = ?", False, 0, config())) == ["fast", "standard", "strong"]
+
+
+def test_image_and_topic_raise_the_score():
+    cfg = config()
+    assert model_router.difficulty_score("2 + 3", True, 0, cfg) == 2
+    assert model_router.difficulty_score("Find the derivative of x^2", False, 0, cfg) == 3
+    assert names(model_router.route("Find the derivative of x^2", True, 0, cfg)) == ["strong"]
+
+
+def test_parse_failures_bonus_is_capped():
+    cfg = config()
+    assert model_router.difficulty_score("2 + 3", False, 10, cfg) == cfg["max_parse_failure_bonus"]
+
+
+def test_overrides_merge_onto_defaults():
+    cfg = config(tiers=[{"name": "only", "model": "gemini-2.5-flash"}], image_weight=0)
+    assert names(model_router.route("2 + 3", True, 0, cfg)) == ["only"]
+    assert cfg["long_length"] == model_router.DEFAULT_CONFIG["long_length"]
+
+
+@pytest.mark.parametrize("overrides", [
+    {"tiers": []},
+    {"tiers": "abc"},
+    {"tiers": ["fast"]},
+    {"tiers": [{"name": "x"}]},
+    {"tiers": [{"name": "x", "model": 3}]},
+    {"tiers": [{"name": "x", "model": "m", "max_score": "4"}]},
+    {"medium_length": "120"},
+    {"image_weight": None},
+    {"parse_failure_weight": True},
+])
+def test_invalid_config_raises_value_error(overrides):
+    with pytest.raises(ValueError):
+        model_router.load_config(overrides)
+
+
+def test_non_object_config_raises_value_error():
+    with pytest.raises(ValueError):
+        model_router.load_config([1, 2])
@@ -0,0 +1,99 @@
+import json
+import logging
+
+from google.generativeai import protos
+from google.generativeai.types import generation_types
+
+import output_budget
+
+MAX_TOKENS = protos.Candidate.FinishReason.MAX_TOKENS
+STOP = protos.Candidate.FinishReason.STOP
+REPLY = json.dumps({
+    "topic": "t",
+    "analysis": {},
+    "equation": "",
+    "steps": [{"title": "s", "explanation": "e"}],
+})
+
+
+def response(text, finish=STOP, prompt=100, candidates=50, thinking=0):
+    parts = [protos.Part(text=text)] if text else []
+    return generation_types.GenerateContentResponse.from_response(protos.GenerateContentResponse(
+        candidates=[protos.Candidate(
+            finish_reason=finish, content=protos.Content(parts=parts, role="model")
+        )],
+        usage_metadata=protos.GenerateContentResponse.UsageMetadata(
+            prompt_token_count=prompt,
+            candidates_token_count=candidates,
+            total_token_count=prompt + candidates + thinking,
+        ),
+    ))
+
+
+class FakeModel:
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.caps = []
+
+    def generate_content(self, contents, generation_config):
+        self.caps.append(generation_config.max_output_tokens)
+        return self.responses.pop(0)
+
+
+def budget(model_name="gemini-2.5-flash", text="1 + 2 = ?"):
+    return output_budget.plan(text, False, "EN", model_name)
+
+
+def test_thinking_reserve_depends_on_tier_and_steps():
+    assert budget("gemini-2.5-flash-lite")["thinking_tokens"] == 0
+    assert budget("gemini-2.5-pro")["thinking_tokens"] > budget("gemini-2.5-flash")["thinking_tokens"]
+    long = "Solve x^2 + 5x + 6 = 0, then 3 4 5 6 7 8 9 10 11 12?"
+    assert budget(text=long)["thinking_tokens"] > budget()["thinking_tokens"]
+
+
+def test_continuation_fence_is_stripped():
+    model = FakeModel(
+        response("```json\n" + REPLY[:40], MAX_TOKENS),
+        response("```json\n" + REPLY[40:] + "\n```"),
+    )
+    text = output_budget.generate(model, ["q"], "EN", budget())
+    assert output_budget.solver.parse_reply(text)["topic"] == "t"
+
+
+def test_empty_truncated_reply_is_a_restart(caplog):
+    b = budget()
+    model = FakeModel(
+        response("", MAX_TOKENS, candidates=0, thinking=b["max_output_tokens"]),
+        response(REPLY, thinking=300),
+    )
+    with caplog.at_level(logging.INFO, logger="output_budget"):
+        output_budget.generate(model, ["q"], "EN", b)
+    assert model.caps == [b["max_output_tokens"], 2 * b["max_output_tokens"]]
+    message = caplog.records[-1].getMessage()
+    assert "continuations 0, restarts 1" in message
+    # Thinking counts towards the output tokens compared with the cap
+    assert f"output tokens {b['max_output_tokens'] + 350}/" in message
+    assert f"thinking {b['max_output_tokens'] + 300}," in message
+
+
+def test_last_tier_gets_an_uncapped_try_after_its_restarts():
+    b = budget("gemini-2.5-pro")
+    cap = b["max_output_tokens"]
+    model = FakeModel(
+        response("", MAX_TOKENS, candidates=0, thinking=cap),
+        response("", MAX_TOKENS, candidates=0, thinking=2 * cap),
+        response(REPLY, thinking=3 * cap),
+    )
+    text = output_budget.generate(model, ["q"], "EN", b, final=True)
+    assert model.caps == [cap, 2 * cap, None]
+    assert output_budget.solver.parse_reply(text)["topic"] == "t"
+
+
+def test_other_tiers_give_up_after_their_restarts():
+    b = budget("gemini-2.5-flash")
+    model = FakeModel(
+        response("", MAX_TOKENS, candidates=0),
+        response("", MAX_TOKENS, candidates=0),
+    )
+    assert output_budget.generate(model, ["q"], "EN", b) == ""
+    assert len(model.caps) == 2